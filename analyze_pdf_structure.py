@@ -4,43 +4,51 @@ PDF Content Analyzer - Analyze the content of Banxico library PDFs to understand
 """
 
 import os
-import pdfplumber
 import re
+from pypdf import PdfReader
 from pathlib import Path
 
+# All date patterns in a single alternation, so the page text is scanned once
+DATE_PATTERNS_RE = re.compile(
+    r'(?P<long>\b\d{1,2}\s+de\s+\w+\s+de\s+\d{4}\b)'  # "15 de marzo de 2024"
+    r'|(?P<month_year>\b\w+\s+\d{4}\b)'  # "marzo 2024"
+    r'|(?P<ymd>\b\d{4}-\d{2}-\d{2}\b)'  # YYYY-MM-DD
+    r'|(?P<dmy>\b\d{1,2}/\d{1,2}/\d{4}\b)'  # DD/MM/YYYY
+    r'|(?P<year>\b\d{4}\b)',  # just year
+    re.IGNORECASE
+)
+
 def analyze_pdf_sample(pdf_path):
     """Analyze a single PDF to understand its structure"""
     print(f"🔍 Analyzing: {os.path.basename(pdf_path)}")
     print("=" * 60)
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            # Get first page (cover page)
-            first_page = pdf.pages[0]
-            text = first_page.extract_text()
-            
-            print("📄 First page text:")
-            print("-" * 40)
-            print(text[:1000])  # First 1000 characters
-            print("-" * 40)
-            
-            # Look for date patterns
-            date_patterns = [
-                r'\b\d{1,2}\s+de\s+\w+\s+de\s+\d{4}\b',  # "15 de marzo de 2024"
-                r'\b\w+\s+\d{4}\b',  # "marzo 2024"
-                r'\b\d{4}\b',  # just year
-                r'\b\d{1,2}/\d{1,2}/\d{4}\b',  # DD/MM/YYYY
-                r'\b\d{4}-\d{2}-\d{2}\b',  # YYYY-MM-DD
-            ]
-            
-            print("\n📅 Found date patterns:")
-            for pattern in date_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    print(f"  Pattern '{pattern}': {matches}")
-            
-            print(f"\n📊 Total pages: {len(pdf.pages)}")
-            
+        reader = PdfReader(pdf_path, strict=False)
+        # Page count straight from the catalog, without walking the page tree
+        num_pages = reader.trailer["/Root"]["/Pages"]["/Count"]
+        
+        # Get first page (cover page)
+        first_page = reader.pages[0]
+        text = first_page.extract_text() or ""
+        
+        print("📄 First page text:")
+        print("-" * 40)
+        print(text[:1000])  # First 1000 characters
+        print("-" * 40)
+        
+        # Look for date patterns
+        buckets = {name: [] for name in DATE_PATTERNS_RE.groupindex}
+        for match in DATE_PATTERNS_RE.finditer(text):
+            buckets[match.lastgroup].append(match.group())
+        
+        print("\n📅 Found date patterns:")
+        for name, matches in buckets.items():
+            if matches:
+                print(f"  Pattern '{name}': {matches}")
+        
+        print(f"\n📊 Total pages: {num_pages}")
+        
     except Exception as e:
         print(f"❌ Error analyzing PDF: {e}")
 
@@ -5,81 +5,274 @@ Automatically renames PDF files based on the date found in the cover page.
 Safe to run multiple times - skips already renamed files.
 """
 
+import hashlib
+import json
+import mmap
 import os
-import pdfplumber
 import re
+import shutil
+import subprocess
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pypdf import PdfReader
 from pathlib import Path
 import logging
 
+try:
+    import re2  # google-re2: linear-time matching, optional
+except ImportError:
+    re2 = None
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-# Spanish month mapping
-MONTHS_ES_TO_NUM = {
-    'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
-    'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
-    'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
-}
+# Spanish months as (name in text, number, capitalized name), in calendar order
+MONTHS = [
+    ('enero', '01', 'Enero'), ('febrero', '02', 'Febrero'),
+    ('marzo', '03', 'Marzo'), ('abril', '04', 'Abril'),
+    ('mayo', '05', 'Mayo'), ('junio', '06', 'Junio'),
+    ('julio', '07', 'Julio'), ('agosto', '08', 'Agosto'),
+    ('septiembre', '09', 'Septiembre'), ('octubre', '10', 'Octubre'),
+    ('noviembre', '11', 'Noviembre'), ('diciembre', '12', 'Diciembre'),
+]
+
+# One capture group per month (groups 1-12, in MONTHS order) plus the year
+MONTH_ALTERNATION = '|'.join(f'({name})' for name, _, _ in MONTHS)
+
+# Spanish month and year pattern (e.g., "JUNIO 2025", "AGOSTO 2024"), matched
+# against normalized text so it needs no case folding
+MONTH_RE = (re2 or re).compile(
+    r'\b(?:' + MONTH_ALTERNATION + r')\s+(\d{4})\b'
+)
+
+# Same pattern over the lower-cased raw bytes of a page content stream
+CONTENT_MONTH_RE = re.compile(
+    rb'\b(?:' + MONTH_ALTERNATION.encode('ascii') + rb')\s+(\d{4})\b'
+)
+
+# The cover date sits in the page header, so try this many characters first
+HEADER_CHARS = 512
+
+# Filename patterns used to detect files that were already renamed
+RENAMED_PREFIX_RE = re.compile(r'^\d{4}-\d{2}')
+YYYYMM_PREFIX_RE = re.compile(r'^\d{6}_')
+PDF_EXT_RE = re.compile(r'\.pdf$', re.IGNORECASE)
+GUID_RE = re.compile(r'^[{]?[0-9A-F-]+[}]?$', re.IGNORECASE)
+WORD_RE = re.compile(r'[a-zA-Z]{3,}')
+
+# With RE2 both decisive filename cases are classified in a single pass:
+# 0 = already renamed (YYYY-MM prefix), 1 = GUID name that needs renaming
+if re2 is not None and hasattr(re2, 'Set'):
+    FILENAME_SET = re2.Set.MatchSet()
+    FILENAME_SET.Add(r'\d{4}-\d{2}')
+    FILENAME_SET.Add(r'(?i)(?:\d{6}_)?[{]?[0-9A-F-]+[}]?\.pdf$')
+    FILENAME_SET.Compile()
+else:
+    FILENAME_SET = None
+
+# poppler's pdftotext is much faster than any pure-Python extractor
+PDFTOTEXT = shutil.which("pdftotext")
+# Seconds to wait for pdftotext before falling back to pypdf on a bad PDF
+PDFTOTEXT_TIMEOUT = 30
+
+# Fingerprint -> YYYY-MM cache so re-runs skip PDFs that were already parsed
+CACHE_FILENAME = ".rename_cache.json"
+
+def normalize_text(text):
+    """Lower-case text and strip accents, once, before any pattern matching"""
+    return (unicodedata.normalize("NFKD", text)
+            .encode("ascii", "ignore").decode("ascii").lower())
+
+def month_year_from_match(match):
+    """Turn a MONTH_RE/CONTENT_MONTH_RE match into YYYY-MM"""
+    groups = match.groups()
+    index = next(i for i, group in enumerate(groups[:12]) if group)
+    year = groups[12]
+    if isinstance(year, bytes):
+        year = year.decode('ascii')
+    return f"{year}-{MONTHS[index][1]}"
+
+def date_from_content_stream(page):
+    """Find the cover date directly in the page's decoded content stream"""
+    contents = page.get_contents()
+    if contents is None:
+        return None
+
+    match = CONTENT_MONTH_RE.search(contents.get_data().lower())
+    return month_year_from_match(match) if match else None
+
+def extract_first_page_text(pdf_path, first_page):
+    """Extract raw text from the first page without layout analysis.
+
+    first_page is None when pypdf could not open the file, pdftotext and
+    pdfplumber are still tried.
+    """
+    if PDFTOTEXT:
+        try:
+            result = subprocess.run(
+                [PDFTOTEXT, "-f", "1", "-l", "1", "-layout", str(pdf_path), "-"],
+                capture_output=True, encoding="utf-8", errors="replace",
+                timeout=PDFTOTEXT_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            logging.warning(f"pdftotext timed out on {pdf_path}, using pypdf")
+        else:
+            if result.returncode == 0 and result.stdout.strip():
+                return result.stdout
+
+    text = ""
+    if first_page is not None:
+        try:
+            text = first_page.extract_text() or ""
+        except Exception as e:
+            logging.warning(f"pypdf could not extract text from {pdf_path}: {e}")
+
+    if not text:
+        # pdfplumber is slow (full layout pass), only use it as a last resort
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            text = pdf.pages[0].extract_text() or ""
+
+    return text
 
 def extract_date_from_pdf(pdf_path):
     """Extract date from PDF cover page"""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if len(pdf.pages) == 0:
-                return None
-            
-            first_page = pdf.pages[0]
-            text = first_page.extract_text()
-            
-            if not text:
-                return None
-            
-            # Look for Spanish month and year pattern
-            pattern = r'\b(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)\s+(\d{4})\b'
-            match = re.search(pattern, text, re.IGNORECASE)
-            
-            if match:
-                month_name = match.group(1).lower()
-                year = match.group(2)
-                month_num = MONTHS_ES_TO_NUM.get(month_name)
-                
-                if month_num:
-                    return f"{year}-{month_num}"
-                
+        # Let pypdf read through a read-only mapping instead of loading the
+        # whole file into memory, and only touch the first page
+        with open(pdf_path, "rb") as fh, \
+                mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # A file pypdf can't open may still be readable by pdftotext
+            try:
+                first_page = PdfReader(mm, strict=False).pages[0]
+            except Exception as e:
+                logging.warning(f"pypdf could not open {pdf_path}: {e}")
+                first_page = None
+
+            # Covers with plain-text literals don't need glyph decoding at all
+            if first_page is not None:
+                try:
+                    date_str = date_from_content_stream(first_page)
+                except Exception as e:
+                    logging.warning(f"Could not read content stream of {pdf_path}: {e}")
+                    date_str = None
+                if date_str:
+                    return date_str
+
+            # Extract text from first page
+            text = normalize_text(extract_first_page_text(pdf_path, first_page))
+
+        if not text:
+            return None
+
+        # Look for Spanish month and year pattern, the cover header first
+        match = MONTH_RE.search(text[:HEADER_CHARS]) or MONTH_RE.search(text)
+
+        if match:
+            return month_year_from_match(match)
+
     except Exception as e:
         logging.error(f"Error reading PDF {pdf_path}: {e}")
-    
+
     return None
 
+def pdf_fingerprint(pdf_path):
+    """Hash the first MiB of a PDF, which is enough to identify its cover page"""
+    try:
+        with open(pdf_path, "rb") as f:
+            return hashlib.blake2b(f.read(1 << 20), digest_size=16).hexdigest()
+    except OSError as e:
+        logging.error(f"Error fingerprinting PDF {pdf_path}: {e}")
+        return None
+
+def load_rename_cache(directory):
+    """Load the fingerprint -> YYYY-MM cache kept next to the PDFs"""
+    try:
+        with open(directory / CACHE_FILENAME, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable cache {CACHE_FILENAME}: {e}")
+        return {}
+
+def save_rename_cache(directory, cache):
+    """Persist the fingerprint -> YYYY-MM cache"""
+    try:
+        with open(directory / CACHE_FILENAME, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+    except OSError as e:
+        logging.warning(f"Could not save cache {CACHE_FILENAME}: {e}")
+
+def extract_dates(pdf_files, cache):
+    """Extract cover dates for several PDFs, keeping input order.
+
+    PDFs whose fingerprint is already in ``cache`` are not parsed again,
+    newly extracted dates are added to it.
+    """
+    fingerprints = [pdf_fingerprint(pdf_file) for pdf_file in pdf_files]
+    misses = [(pdf_file, fp) for pdf_file, fp in zip(pdf_files, fingerprints)
+              if fp is None or fp not in cache]
+    to_parse = [pdf_file for pdf_file, _ in misses]
+
+    if len(to_parse) < 2:
+        parsed = [extract_date_from_pdf(pdf_file) for pdf_file in to_parse]
+    else:
+        # Parsing is CPU-bound and independent per file, so use processes
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            parsed = list(executor.map(extract_date_from_pdf, to_parse, chunksize=4))
+
+    dates = {}
+    for (pdf_file, fp), date_str in zip(misses, parsed):
+        dates[pdf_file] = date_str
+        if fp is not None and date_str:
+            cache[fp] = date_str
+
+    return [dates[pdf_file] if pdf_file in dates else cache[fp]
+            for pdf_file, fp in zip(pdf_files, fingerprints)]
+
+def list_pdf_files(directory):
+    """List the PDF files in a directory without stat-ing every entry"""
+    with os.scandir(directory) as entries:
+        return [Path(entry.path) for entry in entries
+                if entry.name.lower().endswith('.pdf')
+                and entry.is_file(follow_symlinks=False)]
+
+@lru_cache(maxsize=None)
 def is_already_renamed(filename):
     """Check if file has already been renamed"""
+    if FILENAME_SET is not None:
+        # Match returns None, not an empty list, when no pattern matches
+        matched = FILENAME_SET.Match(filename) or ()
+        if 0 in matched:
+            return True
+        if 1 in matched:
+            return False
+    
     # If filename starts with YYYY-MM format, it's already renamed
-    if re.match(r'^\d{4}-\d{2}', filename):
+    if RENAMED_PREFIX_RE.match(filename):
         return True
     
     # If filename contains only GUID after date prefix, needs renaming
-    core_name = re.sub(r'^\d{6}_', '', filename)  # Remove YYYYMM_ prefix
-    core_name = re.sub(r'\.pdf$', '', core_name, re.IGNORECASE)  # Remove .pdf
+    core_name = YYYYMM_PREFIX_RE.sub('', filename)  # Remove YYYYMM_ prefix
+    core_name = PDF_EXT_RE.sub('', core_name)  # Remove .pdf
     
     # If it's a GUID pattern, it needs renaming
-    if re.match(r'^[{]?[0-9A-F-]+[}]?$', core_name, re.IGNORECASE):
+    if GUID_RE.match(core_name):
         return False
     
     # If it has readable text, it's probably already renamed
-    return len(re.findall(r'[a-zA-Z]{3,}', core_name)) > 0
+    return bool(WORD_RE.search(core_name))
 
 def generate_new_filename(date_str):
     """Generate new filename based on extracted date"""
     year, month = date_str.split('-')
-    month_names = {
-        '01': 'Enero', '02': 'Febrero', '03': 'Marzo', '04': 'Abril',
-        '05': 'Mayo', '06': 'Junio', '07': 'Julio', '08': 'Agosto',
-        '09': 'Septiembre', '10': 'Octubre', '11': 'Noviembre', '12': 'Diciembre'
-    }
-    month_name = month_names.get(month, f"Mes{month}")
+    index = int(month) - 1
+    month_name = MONTHS[index][2] if 0 <= index < len(MONTHS) else f"Mes{month}"
     return f"{date_str}_Boletin_Biblioteca_Banxico_{month_name}_{year}.pdf"
 
 def rename_banxico_library_pdfs():
@@ -90,26 +283,31 @@ def rename_banxico_library_pdfs():
         logging.error(f"Directory {directory} does not exist")
         return False
     
-    pdf_files = list(directory.glob("*.pdf"))
+    pdf_files = list_pdf_files(directory)
     logging.info(f"Found {len(pdf_files)} PDF files to process")
     
     renamed_count = 0
     skipped_count = 0
     error_count = 0
     
+    pending = []
     for pdf_file in pdf_files:
-        original_name = pdf_file.name
-        
         # Skip if already renamed
-        if is_already_renamed(original_name):
-            logging.info(f"⏭️  Skipping {original_name} - Already renamed")
+        if is_already_renamed(pdf_file.name):
+            logging.info(f"⏭️  Skipping {pdf_file.name} - Already renamed")
             skipped_count += 1
             continue
-        
+        pending.append(pdf_file)
+    
+    # Extract dates up front, renames are applied one by one below
+    cache = load_rename_cache(directory)
+    dates = extract_dates(pending, cache)
+    save_rename_cache(directory, cache)
+    
+    for pdf_file, date_str in zip(pending, dates):
+        original_name = pdf_file.name
         logging.info(f"🔍 Processing: {original_name}")
         
-        # Extract date
-        date_str = extract_date_from_pdf(pdf_file)
         if not date_str:
             logging.error(f"❌ Could not extract date from {original_name}")
             error_count += 1
@@ -6,7 +6,7 @@ This script will help identify issues when running in CI/CD environment
 
 import os
 import sys
-import subprocess
+import py_compile
 from datetime import datetime
 from pathlib import Path
 
@@ -73,12 +73,10 @@ def test_script_execution():
             print(f"  ✅ {script} exists")
             # Test if it's executable (syntax check)
             try:
-                result = subprocess.run([sys.executable, '-m', 'py_compile', script], 
-                                      capture_output=True, text=True)
-                if result.returncode == 0:
-                    print(f"     ✅ Syntax is valid")
-                else:
-                    print(f"     ❌ Syntax error: {result.stderr}")
+                py_compile.compile(script, doraise=True)
+                print(f"     ✅ Syntax is valid")
+            except py_compile.PyCompileError as e:
+                print(f"     ❌ Syntax error: {e.msg}")
             except Exception as e:
                 print(f"     ⚠️  Could not test syntax: {e}")
         else:
@@ -98,7 +96,9 @@ def check_directories():
         path = Path(dir_path)
         if path.exists():
             print(f"  ✅ {dir_path} exists")
-            print(f"     📊 Contains {len(list(path.glob('*')))} files")
+            with os.scandir(path) as entries:
+                file_count = sum(1 for _ in entries)
+            print(f"     📊 Contains {file_count} files")
         else:
             print(f"  ❌ {dir_path} does not exist")
             try:
@@ -1,5 +1,8 @@
 import os
+import shutil
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from datetime import datetime
@@ -7,22 +10,45 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from time import sleep
 from pathlib import Path
 
+# One session shared by every worker so downloads reuse keep-alive connections
+SESSION = requests.Session()
+SESSION.headers.update({'User-Agent': 'econscrap/1.0'})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5)
+))
+
+def is_up_to_date(pdf_url, filepath):
+    """Compare a local file against the remote Content-Length with a HEAD request"""
+    # Ask for the uncompressed length, it is the one that matches the file on disk
+    try:
+        head = SESSION.head(pdf_url, allow_redirects=True, timeout=30,
+                            headers={'Accept-Encoding': 'identity'})
+    except requests.RequestException:
+        return True  # Can't reach the server, keep the local copy
+    remote_size = head.headers.get('Content-Length')
+    if head.status_code != 200 or remote_size is None or 'Content-Encoding' in head.headers:
+        return True  # Nothing to compare against, keep the local copy
+    return int(remote_size) == os.path.getsize(filepath)
+
 def download_pdf(args):
     """Single PDF download function with retries"""
     pdf_url, filepath, retry_count = args
     for attempt in range(retry_count):
         try:
-            if not os.path.exists(filepath):
-                response = requests.get(pdf_url, stream=True)
-                if response.status_code == 200:
-                    with open(filepath, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    return f"Successfully downloaded: {os.path.basename(filepath)}"
-                else:
-                    sleep(1)
-            else:
+            if os.path.exists(filepath) and is_up_to_date(pdf_url, filepath):
                 return f"File already exists: {os.path.basename(filepath)}"
+
+            response = SESSION.get(pdf_url, stream=True)
+            if response.status_code == 200:
+                response.raw.decode_content = True
+                with open(filepath, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=1 << 20)
+                return f"Successfully downloaded: {os.path.basename(filepath)}"
+            else:
+                response.close()  # hand the connection back to the pool
+                sleep(1)
         except Exception as e:
             if attempt == retry_count - 1:
                 return f"Failed after {retry_count} attempts: {str(e)}"
@@ -41,7 +67,7 @@ def scrape_library_updates(url=None, use_threading=True, max_workers=4):
 
     try:
         print(f"Fetching content from: {url}")
-        response = requests.get(url)
+        response = SESSION.get(url)
         if response.status_code != 200:
             print(f"Failed to access URL. Status code: {response.status_code}")
             return None
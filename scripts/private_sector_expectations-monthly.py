@@ -4,23 +4,28 @@
 
 # paquetes
 import os
+import json
+import shutil
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+import lxml.html
+from lxml import etree
 from pathlib import Path
 import re
 from datetime import datetime   
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from time import sleep
 import time
+from threading import Lock
 from urllib.parse import urljoin
 import logging
 from tqdm import tqdm
 import hashlib
 from typing import Optional, Tuple, Dict
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Set up logging
 logging.basicConfig(
@@ -32,9 +37,74 @@ logging.basicConfig(
     ]
 )
 
+# Shared HTTP session: keep-alive connections to banxico.org.mx are reused by
+# every download, and transient failures are retried by urllib3
+USER_AGENT = 'econscrap/1.0'
+POOL_SIZE = 32
+RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+
+SESSION = requests.Session()
+SESSION.headers.update({'User-Agent': USER_AGENT})
+SESSION.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=RETRY))
+
+class RateLimiter:
+    """Spread requests at most `rps` per second across all threads"""
+    def __init__(self, rps: float):
+        self.interval = 1 / rps
+        self.next_slot = time.monotonic()
+        self.lock = Lock()
+
+    def acquire(self) -> None:
+        # Reserve the next free slot under the lock, wait for it outside of it
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        sleep(slot - now)
+
+# Be nice to the server without stalling workers that could go ahead
+LIMITER = RateLimiter(rps=5)
+
+def part_path(filepath):
+    """Temporary name a PDF is written to, it is renamed into place once complete
+    so an interrupted download never shows up as an existing file"""
+    return filepath.with_name(filepath.name + ".part")
+
+def cache_meta_path(filepath):
+    """Sidecar file holding the HTTP validators of a downloaded PDF"""
+    return Path(f"{filepath}.meta.json")
+
+def load_cache_meta(filepath):
+    """Return the saved {etag, last_modified} of a PDF, or None"""
+    try:
+        return json.loads(cache_meta_path(filepath).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+def save_cache_meta(filepath, response):
+    """Store the ETag/Last-Modified sent by the server next to the PDF"""
+    meta = {'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')}
+    if not any(meta.values()):
+        return
+    try:
+        cache_meta_path(filepath).write_text(json.dumps(meta), encoding='utf-8')
+    except OSError as e:
+        logging.warning(f"Could not save cache metadata for {filepath}: {e}")
+
+def conditional_headers(meta):
+    """Build If-None-Match/If-Modified-Since headers from saved metadata"""
+    headers = {}
+    if meta:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+    return headers
+
 @dataclass
 class ReportInfo:
-    pub_date: datetime
+    pub_date: Optional[datetime]
     title: str
     url: str
     filename: str
@@ -42,9 +112,42 @@ class ReportInfo:
 class BanxicoDownloader:
     def __init__(self, base_path: str, max_workers: int = 3, timeout: int = 30):
         self.base_path = Path(base_path)
-        self.max_workers = max_workers
+        self.max_workers = min(max_workers, POOL_SIZE)
         self.timeout = timeout
         self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=self.max_workers, pool_maxsize=self.max_workers, max_retries=RETRY))
+        # filename -> {size, mtime} of every PDF this class wrote
+        self.cache_path = self.base_path / "cache.json"
+        self.cache = self.load_cache()
+
+    def load_cache(self) -> Dict[str, dict]:
+        try:
+            return json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable cache {self.cache_path}: {e}")
+            return {}
+
+    def save_cache(self) -> None:
+        try:
+            self.cache_path.write_text(json.dumps(self.cache, indent=2, sort_keys=True),
+                                       encoding='utf-8')
+        except OSError as e:
+            logging.warning(f"Could not save cache {self.cache_path}: {e}")
+
+    def is_valid_existing(self, filepath: Path) -> bool:
+        """Check a file on disk, trusting the cache when size and mtime match"""
+        try:
+            stat = filepath.stat()
+        except OSError:
+            return False
+        entry = self.cache.get(filepath.name)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            return True
+        return self.verify_pdf(filepath)
 
     def verify_pdf(self, filepath: Path) -> bool:
         """Verify if downloaded file is a valid PDF"""
@@ -56,204 +159,314 @@ class BanxicoDownloader:
             logging.error(f"Error verifying PDF {filepath}: {e}")
             return False
 
-    def download_report(self, report: ReportInfo) -> Optional[Path]:
+    def prevalidate(self, reports: list[ReportInfo]) -> set[Path]:
+        """Check the reports already on disk in parallel, return the valid paths"""
+        try:
+            with os.scandir(self.base_path) as entries:
+                existing = {entry.name for entry in entries}
+        except FileNotFoundError:
+            return set()
+        
+        paths = [self.base_path / f"{report.filename}.pdf" for report in reports
+                 if f"{report.filename}.pdf" in existing]
+        if not paths:
+            return set()
+        
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            return {path for path, valid in zip(paths, executor.map(self.is_valid_existing, paths))
+                    if valid}
+
+    def download_report(self, report: ReportInfo, known_valid: Optional[bool] = None) -> Optional[Path]:
         filepath = self.base_path / f"{report.filename}.pdf"
+        tmp_path = part_path(filepath)
         
-        if filepath.exists() and self.verify_pdf(filepath):
+        # A valid file is revalidated with a conditional GET when we have its
+        # validators, otherwise it is kept as is
+        keep_existing = self.is_valid_existing(filepath) if known_valid is None else known_valid
+        meta = load_cache_meta(filepath) if keep_existing else None
+        if keep_existing and meta is None:
             logging.info(f"File already exists and valid: {filepath}")
             return filepath
 
         try:
-            response = self.session.get(report.url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            filepath.write_bytes(response.content)
-            
-            if not self.verify_pdf(filepath):
-                filepath.unlink()
-                raise ValueError("Downloaded file is not a valid PDF")
+            LIMITER.acquire()
+            with self.session.get(report.url, timeout=self.timeout, stream=True,
+                                  headers=conditional_headers(meta)) as response:
+                if response.status_code == 304:
+                    logging.info(f"File not modified on server: {filepath}")
+                    return filepath
+                response.raise_for_status()
+                
+                # Check the PDF magic on the first bytes, nothing bad gets written
+                response.raw.decode_content = True
+                head = response.raw.read(4)
+                if not head.startswith(b'%PDF'):
+                    raise ValueError("Downloaded file is not a valid PDF")
                 
+                # Stream the rest to disk instead of holding the PDF in memory
+                with open(tmp_path, 'wb') as f:
+                    f.write(head)
+                    shutil.copyfileobj(response.raw, f, length=1 << 20)
+                os.replace(tmp_path, filepath)
+                
+                stat = filepath.stat()
+                self.cache[filepath.name] = {'size': stat.st_size, 'mtime': stat.st_mtime}
+                save_cache_meta(filepath, response)
             return filepath
             
         except Exception as e:
             logging.error(f"Error downloading {report.url}: {e}")
-            if filepath.exists():
+            tmp_path.unlink(missing_ok=True)
+            if filepath.exists() and not keep_existing:
                 filepath.unlink()
+                self.cache.pop(filepath.name, None)
             return None
 
     def download_all_reports(self, reports: list[ReportInfo]) -> None:
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {executor.submit(self.download_report, report): report 
-                      for report in reports}
+        # Rows pointing at the same file are downloaded once
+        reports = list({report.filename: report for report in reports}.values())
+        
+        # Valid files without validators need no request at all
+        valid = self.prevalidate(reports)
+        tasks = []
+        for report in reports:
+            filepath = self.base_path / f"{report.filename}.pdf"
+            known_valid = filepath in valid
+            if known_valid and not cache_meta_path(filepath).exists():
+                logging.info(f"File already exists and valid: {filepath}")
+                continue
+            tasks.append((report, known_valid))
+        reports = [report for report, _ in tasks]
+        
+        # One worker per pooled connection, never more threads than reports
+        workers = max(1, min(self.max_workers, len(reports)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.download_report, report, known_valid): report 
+                      for report, known_valid in tasks}
             
-            with tqdm(total=len(reports), desc="Downloading reports") as pbar:
+            # Completions are reported to tqdm in batches to keep its lock and
+            # terminal redraws off the hot path
+            batch = max(1, len(reports) // 100)
+            done = shown = 0
+            with tqdm(total=len(reports), desc="Downloading reports",
+                      mininterval=0.5, smoothing=0.1) as pbar:
                 for future in as_completed(futures):
-                    report = futures[future]
-                    try:
-                        filepath = future.result()
-                        if filepath:
-                            logging.info(f"Successfully downloaded: {filepath}")
-                    except Exception as e:
-                        logging.error(f"Failed to download {report.filename}: {e}")
-                    finally:
-                        pbar.update(1)
+                    self.log_result(future, futures[future])
+                    done += 1
+                    if done - shown >= batch or done == len(reports):
+                        pbar.update(done - shown)
+                        shown = done
+        
+        self.save_cache()
+
+    def download_stream(self, reports) -> None:
+        """Download reports while they are still being produced by an iterator.
+
+        At most twice max_workers downloads are queued at a time, so parsing
+        resumes as soon as one finishes instead of building the whole list first.
+        """
+        seen = set()
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for report in reports:
+                # Rows pointing at the same file are downloaded once
+                if report.filename in seen:
+                    continue
+                seen.add(report.filename)
+                futures[executor.submit(self.download_report, report)] = report
+                
+                if len(futures) >= 2 * self.max_workers:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.log_result(future, futures.pop(future))
+            
+            for future in as_completed(futures):
+                self.log_result(future, futures[future])
+        
+        self.save_cache()
+
+    def log_result(self, future, report: ReportInfo) -> None:
+        try:
+            filepath = future.result()
+            if filepath:
+                logging.info(f"Successfully downloaded: {filepath}")
+        except Exception as e:
+            logging.error(f"Failed to download {report.filename}: {e}")
 
 # Define constants
 BASE_URL = "https://www.banxico.org.mx"
 EXPECTATIONS_URL = "https://www.banxico.org.mx/publicaciones-y-prensa/encuestas-sobre-las-expectativas-de-los-especialis/encuestas-expectativas-del-se.html"
 DEFAULT_BASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reports and files", "private_sector_expectations")
 
-def extract_date_and_title(row):
-    """Extract date and report type from the row"""
-    date_cell = row.find('td', class_='bmdateview')
-    title_cell = row.find('td', class_='bmtextview')
+# XPath queries over the index page, compiled once. Cells are matched by class
+# token, report rows are the ones with both a date and a title cell
+DATE_TD = "td[contains(concat(' ', normalize-space(@class), ' '), ' bmdateview ')]"
+TITLE_TD = "td[contains(concat(' ', normalize-space(@class), ' '), ' bmtextview ')]"
+REPORT_ROWS_XPATH = etree.XPath(f"//tr[.//{DATE_TD} and .//{TITLE_TD}]")
+DATE_TEXT_XPATH = etree.XPath(f"string((.//{DATE_TD})[1])")
+TITLE_CELL_XPATH = etree.XPath(f"(.//{TITLE_TD})[1]")
+PDF_LINKS_XPATH = etree.XPath(".//a[@href and substring(@href, string-length(@href) - 3) = '.pdf']")
+DATE_SPAN_XPATH = etree.XPath(f"string((.//{DATE_TD})[1]//span)")
+TITLE_TEXTS_XPATH = etree.XPath(".//text()")
+
+# Report type of a PDF link, keyed by the phrase found in the link text
+LINK_TYPES = {
+    'texto completo': 'completo',
+    'resumen': 'resumen',
+    'presentación ejecutiva': 'presentacion',
+    'infografía': 'infografia',
+}
+LINK_TYPE_RE = re.compile('|'.join(map(re.escape, LINK_TYPES)))
+
+# Characters that are not allowed in filenames
+UNSAFE_FILENAME_RE = re.compile(r'[<>:"/\\|?*]')
+
+# Reported month and year in a title, e.g. "...: Junio 2025"
+TITLE_MONTH_RE = re.compile(r':\s*(\w+)\s+(\d{4})')
+MONTH_NUMBERS = {
+    'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
+    'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
+    'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
+}
+
+@lru_cache(maxsize=None)
+def fetch_index(url):
+    """Fetch and parse an index page once, later callers reuse the tree"""
+    response = SESSION.get(url, timeout=30)
+    response.raise_for_status()
+    # Decode with the charset sent in Content-Type, lxml only falls back to the
+    # page's <meta charset> when the header has none
+    has_charset = 'charset' in response.headers.get('Content-Type', '').lower()
+    parser = lxml.html.HTMLParser(encoding=response.encoding if has_charset else None)
+    return lxml.html.fromstring(response.content, parser=parser)
+
+def create_reports_from_html(url) -> list[ReportInfo]:
+    """List every typed PDF link of an index page as a ReportInfo"""
+    tree = fetch_index(url)
     
-    if date_cell and title_cell:
-        date_str = date_cell.text.strip()
+    reports = []
+    
+    for row in REPORT_ROWS_XPATH(tree):
         # Convert date from DD/MM/YY to YYYYMM format
         try:
-            date = datetime.strptime(date_str, '%d/%m/%y')
-            date_formatted = date.strftime('%Y%m')
-        except:
-            date_formatted = 'unknown_date'
+            pub_date = datetime.strptime(DATE_TEXT_XPATH(row).strip(), '%d/%m/%y')
+            date = pub_date.strftime('%Y%m')
+        except ValueError:
+            pub_date = None
+            date = 'unknown_date'
         
-        return date_formatted, title_cell
-    return None, None
-
-def create_dataframe_from_html(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    data = {'Date': [], 'Title': [], 'Link': [], 'Type': []}
-    
-    # Find all table rows
-    rows = soup.find_all('tr')
-    
-    for row in rows:
-        date, title_cell = extract_date_and_title(row)
-        if date and title_cell:
-            # Find all links in the title cell
-            links = title_cell.find_all('a', href=True)
-            for link in links:
-                # Extract report type from the link text
-                link_text = link.text.strip().lower()
-                if 'texto completo' in link_text:
-                    report_type = 'completo'
-                elif 'resumen' in link_text:
-                    report_type = 'resumen'
-                elif 'presentación ejecutiva' in link_text:
-                    report_type = 'presentacion'
-                elif 'infografía' in link_text:
-                    report_type = 'infografia'
-                else:
-                    continue  # Skip non-PDF links
-                
-                if link['href'].endswith('.pdf'):
-                    data['Date'].append(date)
-                    data['Title'].append(title_cell.contents[0].strip())
-                    data['Link'].append(link['href'])
-                    data['Type'].append(report_type)
+        title_cell = TITLE_CELL_XPATH(row)[0]
+        title = (title_cell.text or '').strip()
+        clean_title = UNSAFE_FILENAME_RE.sub('', title).strip().replace(' ', '-')
+        
+        for link in PDF_LINKS_XPATH(title_cell):
+            # Extract report type from the link text
+            match = LINK_TYPE_RE.search(link.text_content().lower())
+            if not match:
+                continue  # Skip other links
+            report_type = LINK_TYPES[match.group(0)]
+            
+            reports.append(ReportInfo(pub_date=pub_date, title=title, url=link.get('href'),
+                                      filename=f"{date}_{report_type}_{clean_title}"))
     
-    return pd.DataFrame(data)
+    return reports
 
 def clean_filename(date, title, report_type):
     # Create filename format: YYYYMM_type_clean-title.pdf
-    clean_title = re.sub(r'[<>:"/\\|?*]', '', title)
+    clean_title = UNSAFE_FILENAME_RE.sub('', title)
     clean_title = clean_title.strip().replace(' ', '-')
     return f"{date}_{report_type}_{clean_title}.pdf"
 
-def download_pdf(args):
-    """Single PDF download function with retries"""
-    pdf_url, filepath, retry_count = args
-    for attempt in range(retry_count):
+# Errors raised by a connection that drops while the body is being read
+BODY_ERRORS = (ProtocolError, ReadTimeoutError, requests.exceptions.ChunkedEncodingError)
+
+def with_retries(fn, attempts=3, backoff=1.0):
+    """Call fn(), retrying transfers that fail midway with a linear backoff.
+
+    SESSION already retries failed connections and 5xx answers, this only
+    covers connection drops raised while the body is being read. HTTP errors
+    are never retried here.
+    """
+    for attempt in range(1, attempts + 1):
         try:
-            if not os.path.exists(filepath):
-                response = requests.get(pdf_url, stream=True)
-                if response.status_code == 200:
-                    with open(filepath, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    return f"Successfully downloaded: {os.path.basename(filepath)}"
-                else:
-                    sleep(1)
-            else:
-                return f"File already exists: {os.path.basename(filepath)}"
-        except Exception as e:
-            if attempt == retry_count - 1:
-                return f"Failed after {retry_count} attempts: {str(e)}"
-            sleep(1)
-    return "Max retries reached"
+            return fn()
+        except BODY_ERRORS:
+            if attempt == attempts:
+                raise
+            sleep(backoff * attempt)
+
+def download_pdf_task(args):
+    """Download one (pdf_url, filepath, already) task, used by the thread pool"""
+    pdf_url, filepath, already = args
+    tmp_path = part_path(filepath)
+    # Files already on disk are only fetched again if they changed
+    meta = load_cache_meta(filepath) if already else None
+
+    def fetch():
+        LIMITER.acquire()
+        with SESSION.get(pdf_url, timeout=30, stream=True,
+                         headers=conditional_headers(meta)) as response:
+            if response.status_code == 304:
+                return f"Not modified: {filepath.name}"
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with open(tmp_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=1 << 20)
+            os.replace(tmp_path, filepath)
+            save_cache_meta(filepath, response)
+        return f"Successfully downloaded: {filepath.name}"
+
+    try:
+        return with_retries(fetch)
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        return f"Failed to download {filepath.name}: {str(e)}"
 
 def scrape_banxico_reports(url, report_type="quarterly", use_threading=True, max_workers=4):
     """Main function to scrape and download reports with optional threading"""
     try:
         print(f"Starting download from: {url}")
-        download_folder = os.path.join(DEFAULT_BASE_PATH, f"banxico_{report_type}_reports")
-        Path(download_folder).mkdir(parents=True, exist_ok=True)
+        download_folder = Path(DEFAULT_BASE_PATH) / f"banxico_{report_type}_reports"
+        download_folder.mkdir(parents=True, exist_ok=True)
         print(f"Download folder: {download_folder}")
 
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"Failed to get webpage. Status code: {response.status_code}")
-            return None
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        data = {'Date': [], 'Title': [], 'Link': [], 'Type': []}
-        rows = soup.find_all('tr')
-        print(f"Found {len(rows)} rows in the table")
-
-        for row in rows:
-            date, title_cell = extract_date_and_title(row)
-            if date and title_cell:
-                links = title_cell.find_all('a', href=True)
-                for link in links:
-                    link_text = link.text.strip().lower()
-                    if 'texto completo' in link_text:
-                        report_type = 'completo'
-                    elif 'resumen' in link_text:
-                        report_type = 'resumen'
-                    elif 'presentación ejecutiva' in link_text:
-                        report_type = 'presentacion'
-                    elif 'infografía' in link_text:
-                        report_type = 'infografia'
-                    else:
-                        continue
-                    
-                    if link['href'].endswith('.pdf'):
-                        data['Date'].append(date)
-                        data['Title'].append(title_cell.contents[0].strip())
-                        data['Link'].append(link['href'])
-                        data['Type'].append(report_type)
-
-        df = pd.DataFrame(data)
+        reports = create_reports_from_html(url)
+        print(f"Found {len(reports)} PDF links in the table")
         
         # Create download tasks
-        base_url = "https://www.banxico.org.mx"
-        download_tasks = []
+        pdf_urls = [urljoin(BASE_URL, report.url) for report in reports]
+        filenames = [f"{report.filename}.pdf" for report in reports]
+
+        # One directory listing instead of a stat call per file
+        with os.scandir(download_folder) as entries:
+            existing = {entry.name for entry in entries}
         
-        for _, row in df.iterrows():
-            pdf_url = f"{base_url}{row['Link']}" if row['Link'].startswith('/') else row['Link']
-            clean_title = re.sub(r'[<>:"/\\|?*]', '', row['Title'])
-            clean_title = clean_title.strip().replace(' ', '-')
-            filename = f"{row['Date']}_{row['Type']}_{clean_title}.pdf"
-            filepath = os.path.join(download_folder, filename)
-            download_tasks.append((pdf_url, filepath, 3))
+        # Several rows can resolve to the same file, download it only once
+        download_tasks = []
+        for filename, pdf_url in dict(zip(filenames, pdf_urls)).items():
+            already = filename in existing
+            # Files without saved validators can't be revalidated, keep them
+            if already and f"{filename}.meta.json" not in existing:
+                continue
+            download_tasks.append((pdf_url, download_folder / filename, already))
+        print(f"{len(download_tasks)} files to download or revalidate")
 
         # Choose download method
         if use_threading:
+            # More workers than pooled connections would only queue on the pool
+            max_workers = max(1, min(max_workers, POOL_SIZE, len(download_tasks)))
             print(f"Starting parallel download with {max_workers} workers")
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [executor.submit(download_pdf, task) for task in download_tasks]
+                futures = [executor.submit(download_pdf_task, task) for task in download_tasks]
                 for future in as_completed(futures):
                     print(future.result())
         else:
             print("Starting sequential download")
             for task in download_tasks:
-                result = download_pdf(task)
+                result = download_pdf_task(task)
                 print(result)
-                sleep(0.5)  # Prevent rate limiting
 
-        return df
+        return reports
 
     except Exception as e:
         print(f"Main function error: {str(e)}")
@@ -261,15 +474,10 @@ def scrape_banxico_reports(url, report_type="quarterly", use_threading=True, max
 
 def parse_month_from_title(title):
     """Extract the reported month from title"""
-    month_map = {
-        'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
-        'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
-        'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
-    }
-    match = re.search(r':\s*(\w+)\s+(\d{4})', title)
+    match = TITLE_MONTH_RE.search(title)
     if match:
         month, year = match.groups()
-        month_num = month_map.get(month.lower())
+        month_num = MONTH_NUMBERS.get(month.lower())
         return month_num, year, month.lower()
     return None, None, None
 
@@ -278,57 +486,16 @@ def format_filename(pub_date, report_month, report_year):
     short_year = report_year[-2:]
     return f"{pub_date.strftime('%Y.%m.%d')}-ESESP-{report_month}{short_year}"
 
-def download_pdf(url, filename, base_path):
-    """Download PDF file with retry logic"""
-    full_path = os.path.join(base_path, f"{filename}.pdf")
-    if os.path.exists(full_path):
-        print(f"File already exists: {filename}")
-        return
-    
-    for attempt in range(3):
-        try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            with open(full_path, 'wb') as f:
-                f.write(response.content)
-            print(f"Downloaded: {filename}")
-            time.sleep(1)  # Be nice to the server
-            break
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed for {filename}: {str(e)}")
-            if attempt == 2:
-                print(f"Failed to download {filename}")
-            time.sleep(2)
-
-def main():
-    # Create output directory
-    output_dir = Path(DEFAULT_BASE_PATH)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    print(f"Starting download from: {EXPECTATIONS_URL}")
-    print(f"Download folder: {output_dir}")
-    
-    # Get the webpage content
-    response = requests.get(EXPECTATIONS_URL)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    # Find all rows with reports
-    rows = soup.find_all('tr')
-    print(f"Found {len(rows)} rows in the table")
-    
-    for row in rows:
+def iter_expectation_reports(tree):
+    """Yield a ReportInfo for every survey row, as soon as it is parsed"""
+    for row in REPORT_ROWS_XPATH(tree):
         try:
-            date_cell = row.find('td', class_='bmdateview')
-            title_cell = row.find('td', class_='bmtextview')
-            
-            if not (date_cell and title_cell):
-                continue
-                
-            date_str = date_cell.find('span').text.strip()
-            title = title_cell.get_text(strip=True)
-            pdf_link = title_cell.find('a', href=lambda x: x and x.endswith('.pdf'))
+            date_str = DATE_SPAN_XPATH(row).strip()
+            title_cell = TITLE_CELL_XPATH(row)[0]
+            title = ''.join(text.strip() for text in TITLE_TEXTS_XPATH(title_cell))
+            pdf_links = PDF_LINKS_XPATH(title_cell)
             
-            if not pdf_link:
+            if not pdf_links:
                 continue
                 
             pub_date = datetime.strptime(date_str, '%d/%m/%y')
@@ -338,39 +505,29 @@ def main():
                 continue
             
             filename = format_filename(pub_date, report_month, report_year)
-            pdf_url = urljoin(BASE_URL, pdf_link['href'])
-            
-            download_pdf(pdf_url, filename, output_dir)
-            time.sleep(1)  # Be nice to the server
+            pdf_url = urljoin(BASE_URL, pdf_links[0].get('href'))
             
         except Exception as e:
             print(f"Error processing row: {e}")
             continue
+        
+        yield ReportInfo(pub_date=pub_date, title=title, url=pdf_url, filename=filename)
 
-if __name__ == "__main__":
-    try:
-        main()
-    except Exception as e:
-        print(f"Script failed to execute properly: {e}")
-
-    quarterly_url = "https://www.banxico.org.mx/publicaciones-y-prensa/encuestas-sobre-las-expectativas-de-los-especialis/encuestas-expectativas-del-se.html"
+def main():
+    # Create output directory
+    output_dir = Path(DEFAULT_BASE_PATH)
+    output_dir.mkdir(parents=True, exist_ok=True)
     
-    # With threading (default)
-    df = scrape_banxico_reports(quarterly_url, report_type="quarterly", use_threading=True, max_workers=10)
+    print(f"Starting download from: {EXPECTATIONS_URL}")
+    print(f"Download folder: {output_dir}")
     
-    # Without threading (uncomment to use)
-    # df = scrape_banxico_reports(quarterly_url, report_type="quarterly", use_threading=False)
+    # Get the webpage content, shared with scrape_banxico_reports
+    tree = fetch_index(EXPECTATIONS_URL)
+    print(f"Found {len(REPORT_ROWS_XPATH(tree))} rows in the table")
     
-    if df is not None:
-        print(f"Successfully processed {len(df)} documents")
-    else:
-        print("Script failed to execute properly")
-
-import logging
-import time
-from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass
+    # Downloads start with the first parsed row
+    downloader = BanxicoDownloader(output_dir)
+    downloader.download_stream(iter_expectation_reports(tree))
 
 @dataclass
 class ScrapingConfig:
@@ -390,7 +547,7 @@ def scrape_banxico_reports_optimized(
     url: str,
     report_type: str = "quarterly",
     config: Optional[ScrapingConfig] = None
-) -> Optional[pd.DataFrame]:
+) -> Optional[list[ReportInfo]]:
     logger = setup_logging()
     start_time = time.perf_counter()
     
@@ -400,23 +557,23 @@ def scrape_banxico_reports_optimized(
     try:
         if config.use_threading:
             with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
-                df = scrape_banxico_reports(
+                reports = scrape_banxico_reports(
                     url,
                     report_type=report_type,
                     use_threading=True,
                     max_workers=config.max_workers
                 )
         else:
-            df = scrape_banxico_reports(
+            reports = scrape_banxico_reports(
                 url,
                 report_type=report_type,
                 use_threading=False
             )
         
-        if df is not None and not df.empty:
+        if reports:
             execution_time = time.perf_counter() - start_time
-            logger.info(f"Successfully processed {len(df)} documents in {execution_time:.2f} seconds")
-            return df
+            logger.info(f"Successfully processed {len(reports)} documents in {execution_time:.2f} seconds")
+            return reports
         else:
             logger.error("No data was retrieved")
             return None
@@ -425,21 +582,6 @@ def scrape_banxico_reports_optimized(
         logger.error(f"Error during scraping: {str(e)}")
         return None
 
-# Usage
-quarterly_url = "https://www.banxico.org.mx/publicaciones-y-prensa/encuestas-sobre-las-expectativas-de-los-especialis/encuestas-expectativas-del-se.html"
-
-config = ScrapingConfig(
-    use_threading=True,
-    max_workers=min(32, os.cpu_count() * 4),
-    timeout=30,
-    retry_attempts=3
-)
-
-df = scrape_banxico_reports_optimized(quarterly_url, report_type="quarterly", config=config)
-
-import os
-from pathlib import Path
-
 # Define base paths as constants
 BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__))).parent
 REPORTS_DIR = BASE_DIR / "reports and files" / "private_sector_expectations"
@@ -464,28 +606,42 @@ def setup_directories():
         logging.error(f"Failed to create directory structure: {e}")
         raise
 
-# Add this at the start of your main execution
-path_config = PathConfig()
-setup_directories()
-
 # When saving files, use:
 def save_file(content, filename):
-    file_path = path_config.get_file_path(filename)
+    file_path = PathConfig().get_file_path(filename)
     with open(file_path, 'wb') as f:
         f.write(content)
 
+def run_all():
+    """Run every scraper in this script; nothing happens at import time"""
+    setup_directories()
+
+    try:
+        main()
+    except Exception as e:
+        print(f"Script failed to execute properly: {e}")
 
+    quarterly_url = "https://www.banxico.org.mx/publicaciones-y-prensa/encuestas-sobre-las-expectativas-de-los-especialis/encuestas-expectativas-del-se.html"
+    
+    # With threading (default)
+    reports = scrape_banxico_reports(quarterly_url, report_type="quarterly", use_threading=True, max_workers=10)
+    
+    # Without threading (uncomment to use)
+    # reports = scrape_banxico_reports(quarterly_url, report_type="quarterly", use_threading=False)
+    
+    if reports is not None:
+        print(f"Successfully processed {len(reports)} documents")
+    else:
+        print("Script failed to execute properly")
 
-#there are some issues:
-# tarting parallel download with 10 workers
-# Main function error: download_pdf() missing 2 required positional arguments: 'filename' and 'base_path'
-# Script failed to execute properly
-# Starting download from: https://www.banxico.org.mx/publicaciones-y-prensa/encuestas-sobre-las-expectativas-de-los-especialis/encuestas-expectativas-del-se.html
-# Download folder: /home/vjvelascorios/Documents/GitHub/econscrap/reports and files/private_sector_expectations/banxico_quarterly_reports
-# Found 316 rows in the table
-# Starting parallel download with 32 workers
-# Main function error: download_pdf() missing 2 required positional arguments: 'filename' and 'base_path'
-# 2025-06-01 22:42:03,248 - ERROR - No data was retrieved
-# 2025-06-01 22:42:03,249 - INFO - Directory structure verified at /home/vjvelascorios/Documents/GitHub/econscrap/reports and files/private_sector_expectations
+    config = ScrapingConfig(
+        use_threading=True,
+        max_workers=min(32, os.cpu_count() * 4),
+        timeout=30,
+        retry_attempts=3
+    )
+
+    reports = scrape_banxico_reports_optimized(quarterly_url, report_type="quarterly", config=config)
 
-# [Done] exited with code=0 in 313.255 seconds
\ No newline at end of file
+if __name__ == "__main__":
+    run_all()
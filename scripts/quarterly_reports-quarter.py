@@ -4,158 +4,181 @@
 
 # paquetes
 import os
+import shutil
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import lxml.html
+from lxml import etree
 from pathlib import Path
 import re
 from datetime import datetime   
+from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from time import sleep
+import time
+from threading import Lock
+from urllib.parse import urljoin
+from dataclasses import dataclass
+from typing import Optional
 
 # Define base path
 DEFAULT_BASE_PATH = r"reports and files"
 Path(DEFAULT_BASE_PATH).mkdir(parents=True, exist_ok=True)
 
-def extract_date_and_title(row):
-    """Extract date and report type from the row"""
-    date_cell = row.find('td', class_='bmdateview')
-    title_cell = row.find('td', class_='bmtextview')
+# Shared HTTP session: keep-alive connections to banxico.org.mx are reused by
+# every download, and transient failures are retried by urllib3
+USER_AGENT = 'econscrap/1.0'
+POOL_SIZE = 32
+RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+
+SESSION = requests.Session()
+SESSION.headers.update({'User-Agent': USER_AGENT})
+SESSION.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=RETRY))
+
+class RateLimiter:
+    """Spread requests at most `rps` per second across all threads"""
+    def __init__(self, rps: float):
+        self.interval = 1 / rps
+        self.next_slot = time.monotonic()
+        self.lock = Lock()
+
+    def acquire(self) -> None:
+        # Reserve the next free slot under the lock, wait for it outside of it
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        sleep(slot - now)
+
+# Be nice to the server without stalling workers that could go ahead
+LIMITER = RateLimiter(rps=5)
+
+@dataclass
+class ReportInfo:
+    pub_date: Optional[datetime]
+    title: str
+    url: str
+    filename: str
+
+# XPath queries over the index page, compiled once. Cells are matched by class
+# token, report rows are the ones with both a date and a title cell
+DATE_TD = "td[contains(concat(' ', normalize-space(@class), ' '), ' bmdateview ')]"
+TITLE_TD = "td[contains(concat(' ', normalize-space(@class), ' '), ' bmtextview ')]"
+REPORT_ROWS_XPATH = etree.XPath(f"//tr[.//{DATE_TD} and .//{TITLE_TD}]")
+DATE_TEXT_XPATH = etree.XPath(f"string((.//{DATE_TD})[1])")
+TITLE_CELL_XPATH = etree.XPath(f"(.//{TITLE_TD})[1]")
+PDF_LINKS_XPATH = etree.XPath(".//a[@href and substring(@href, string-length(@href) - 3) = '.pdf']")
+
+# Report type of a PDF link, keyed by the phrase found in the link text
+LINK_TYPES = {
+    'texto completo': 'completo',
+    'resumen': 'resumen',
+    'presentación ejecutiva': 'presentacion',
+    'infografía': 'infografia',
+}
+LINK_TYPE_RE = re.compile('|'.join(map(re.escape, LINK_TYPES)))
+
+# Characters that are not allowed in filenames
+UNSAFE_FILENAME_RE = re.compile(r'[<>:"/\\|?*]')
+
+@lru_cache(maxsize=None)
+def fetch_index(url):
+    """Fetch and parse an index page once, later callers reuse the tree"""
+    response = SESSION.get(url, timeout=30)
+    response.raise_for_status()
+    # Decode with the charset sent in Content-Type, lxml only falls back to the
+    # page's <meta charset> when the header has none
+    has_charset = 'charset' in response.headers.get('Content-Type', '').lower()
+    parser = lxml.html.HTMLParser(encoding=response.encoding if has_charset else None)
+    return lxml.html.fromstring(response.content, parser=parser)
+
+def create_reports_from_html(url) -> list[ReportInfo]:
+    """List every typed PDF link of an index page as a ReportInfo"""
+    tree = fetch_index(url)
     
-    if date_cell and title_cell:
-        date_str = date_cell.text.strip()
+    reports = []
+    
+    for row in REPORT_ROWS_XPATH(tree):
         # Convert date from DD/MM/YY to YYYYMM format
         try:
-            date = datetime.strptime(date_str, '%d/%m/%y')
-            date_formatted = date.strftime('%Y%m')
-        except:
-            date_formatted = 'unknown_date'
+            pub_date = datetime.strptime(DATE_TEXT_XPATH(row).strip(), '%d/%m/%y')
+            date = pub_date.strftime('%Y%m')
+        except ValueError:
+            pub_date = None
+            date = 'unknown_date'
         
-        return date_formatted, title_cell
-    return None, None
-
-def create_dataframe_from_html(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    data = {'Date': [], 'Title': [], 'Link': [], 'Type': []}
-    
-    # Find all table rows
-    rows = soup.find_all('tr')
-    
-    for row in rows:
-        date, title_cell = extract_date_and_title(row)
-        if date and title_cell:
-            # Find all links in the title cell
-            links = title_cell.find_all('a', href=True)
-            for link in links:
-                # Extract report type from the link text
-                link_text = link.text.strip().lower()
-                if 'texto completo' in link_text:
-                    report_type = 'completo'
-                elif 'resumen' in link_text:
-                    report_type = 'resumen'
-                elif 'presentación ejecutiva' in link_text:
-                    report_type = 'presentacion'
-                elif 'infografía' in link_text:
-                    report_type = 'infografia'
-                else:
-                    continue  # Skip non-PDF links
-                
-                if link['href'].endswith('.pdf'):
-                    data['Date'].append(date)
-                    data['Title'].append(title_cell.contents[0].strip())
-                    data['Link'].append(link['href'])
-                    data['Type'].append(report_type)
+        title_cell = TITLE_CELL_XPATH(row)[0]
+        title = (title_cell.text or '').strip()
+        clean_title = UNSAFE_FILENAME_RE.sub('', title).strip().replace(' ', '-')
+        
+        for link in PDF_LINKS_XPATH(title_cell):
+            # Extract report type from the link text
+            match = LINK_TYPE_RE.search(link.text_content().lower())
+            if not match:
+                continue  # Skip other links
+            report_type = LINK_TYPES[match.group(0)]
+            
+            reports.append(ReportInfo(pub_date=pub_date, title=title, url=link.get('href'),
+                                      filename=f"{date}_{report_type}_{clean_title}"))
     
-    return pd.DataFrame(data)
+    return reports
 
 def clean_filename(date, title, report_type):
     # Create filename format: YYYYMM_type_clean-title.pdf
-    clean_title = re.sub(r'[<>:"/\\|?*]', '', title)
+    clean_title = UNSAFE_FILENAME_RE.sub('', title)
     clean_title = clean_title.strip().replace(' ', '-')
     return f"{date}_{report_type}_{clean_title}.pdf"
 
 def download_pdf(args):
-    """Single PDF download function with retries"""
-    pdf_url, filepath, retry_count = args
-    for attempt in range(retry_count):
-        try:
-            if not os.path.exists(filepath):
-                response = requests.get(pdf_url, stream=True)
-                if response.status_code == 200:
-                    with open(filepath, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    return f"Successfully downloaded: {os.path.basename(filepath)}"
-                else:
-                    sleep(1)
-            else:
-                return f"File already exists: {os.path.basename(filepath)}"
-        except Exception as e:
-            if attempt == retry_count - 1:
-                return f"Failed after {retry_count} attempts: {str(e)}"
-            sleep(1)
-    return "Max retries reached"
+    """Single PDF download function, retries are handled by SESSION"""
+    pdf_url, filepath = args
+    # Write to a temporary name and rename once complete, so an interrupted
+    # download never shows up as an existing file
+    tmp_path = filepath.with_name(filepath.name + ".part")
+    try:
+        LIMITER.acquire()
+        with SESSION.get(pdf_url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with open(tmp_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=1 << 20)
+        os.replace(tmp_path, filepath)
+        return f"Successfully downloaded: {filepath.name}"
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        return f"Failed to download {filepath.name}: {str(e)}"
 
 def scrape_banxico_reports(url, report_type="quarterly", use_threading=True, max_workers=4):
     """Main function to scrape and download reports with optional threading"""
     try:
         print(f"Starting download from: {url}")
-        download_folder = os.path.join(DEFAULT_BASE_PATH, f"banxico_{report_type}_reports")
-        Path(download_folder).mkdir(parents=True, exist_ok=True)
+        download_folder = Path(DEFAULT_BASE_PATH) / f"banxico_{report_type}_reports"
+        download_folder.mkdir(parents=True, exist_ok=True)
         print(f"Download folder: {download_folder}")
 
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"Failed to get webpage. Status code: {response.status_code}")
-            return None
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        data = {'Date': [], 'Title': [], 'Link': [], 'Type': []}
-        rows = soup.find_all('tr')
-        print(f"Found {len(rows)} rows in the table")
-
-        for row in rows:
-            date, title_cell = extract_date_and_title(row)
-            if date and title_cell:
-                links = title_cell.find_all('a', href=True)
-                for link in links:
-                    link_text = link.text.strip().lower()
-                    if 'texto completo' in link_text:
-                        report_type = 'completo'
-                    elif 'resumen' in link_text:
-                        report_type = 'resumen'
-                    elif 'presentación ejecutiva' in link_text:
-                        report_type = 'presentacion'
-                    elif 'infografía' in link_text:
-                        report_type = 'infografia'
-                    else:
-                        continue
-                    
-                    if link['href'].endswith('.pdf'):
-                        data['Date'].append(date)
-                        data['Title'].append(title_cell.contents[0].strip())
-                        data['Link'].append(link['href'])
-                        data['Type'].append(report_type)
-
-        df = pd.DataFrame(data)
+        reports = create_reports_from_html(url)
+        print(f"Found {len(reports)} PDF links in the table")
         
         # Create download tasks
         base_url = "https://www.banxico.org.mx"
-        download_tasks = []
+        pdf_urls = [urljoin(base_url, report.url) for report in reports]
+        filenames = [f"{report.filename}.pdf" for report in reports]
+
+        # One directory listing instead of a stat call per file
+        with os.scandir(download_folder) as entries:
+            existing = {entry.name for entry in entries}
         
-        for _, row in df.iterrows():
-            pdf_url = f"{base_url}{row['Link']}" if row['Link'].startswith('/') else row['Link']
-            clean_title = re.sub(r'[<>:"/\\|?*]', '', row['Title'])
-            clean_title = clean_title.strip().replace(' ', '-')
-            filename = f"{row['Date']}_{row['Type']}_{clean_title}.pdf"
-            filepath = os.path.join(download_folder, filename)
-            download_tasks.append((pdf_url, filepath, 3))
+        # Several rows can resolve to the same file, download it only once
+        download_tasks = [(pdf_url, download_folder / filename)
+                          for filename, pdf_url in dict(zip(filenames, pdf_urls)).items()
+                          if filename not in existing]
+        print(f"{len(download_tasks)} new files to download")
 
         # Choose download method
         if use_threading:
+            # More workers than pooled connections would only queue on the pool
+            max_workers = max(1, min(max_workers, POOL_SIZE, len(download_tasks)))
             print(f"Starting parallel download with {max_workers} workers")
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 futures = [executor.submit(download_pdf, task) for task in download_tasks]
@@ -166,9 +189,8 @@ def scrape_banxico_reports(url, report_type="quarterly", use_threading=True, max
             for task in download_tasks:
                 result = download_pdf(task)
                 print(result)
-                sleep(0.5)  # Prevent rate limiting
 
-        return df
+        return reports
 
     except Exception as e:
         print(f"Main function error: {str(e)}")
@@ -178,12 +200,12 @@ if __name__ == "__main__":
     quarterly_url = "https://www.banxico.org.mx/publicaciones-y-prensa/informes-trimestrales/informes-trimestrales-precios.html"
     
     # With threading (default)
-    df = scrape_banxico_reports(quarterly_url, report_type="quarterly", use_threading=True, max_workers=10)
+    reports = scrape_banxico_reports(quarterly_url, report_type="quarterly", use_threading=True, max_workers=10)
     
     # Without threading (uncomment to use)
-    # df = scrape_banxico_reports(quarterly_url, report_type="quarterly", use_threading=False)
+    # reports = scrape_banxico_reports(quarterly_url, report_type="quarterly", use_threading=False)
     
-    if df is not None:
-        print(f"Successfully processed {len(df)} documents")
+    if reports is not None:
+        print(f"Successfully processed {len(reports)} documents")
     else:
         print("Script failed to execute properly")
@@ -1,16 +1,63 @@
 import os
+import json
+import logging
+import queue
+import socket
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from collections import namedtuple
+import shutil
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from io import BytesIO
+from urllib.parse import urlparse
+from lxml import etree
 from pathlib import Path
-import re
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from time import sleep
 
 # Define base path
 DEFAULT_BASE_PATH = r"reports and files"
 
+# One session for every request to banxico.org.mx so downloads reuse
+# keep-alive connections; urllib3 retries failed requests
+MAX_CONNECTIONS_PER_HOST = 16  # upper bound on parallel downloads, be nice to the origin
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 4)
+
+def get_max_workers():
+    """Parallel downloads, from BANXICO_MAX_WORKERS if set, clamped to a sane range"""
+    try:
+        max_workers = int(os.environ.get('BANXICO_MAX_WORKERS', DEFAULT_MAX_WORKERS))
+    except ValueError:
+        max_workers = DEFAULT_MAX_WORKERS
+    return max(1, min(max_workers, MAX_CONNECTIONS_PER_HOST))
+
+MAX_WORKERS = get_max_workers()
+TIMEOUT = (5, 30)  # (connect, read) seconds, so no worker stalls forever
+SESSION = requests.Session()
+# Sized for the largest worker count a caller may pass, not just the default
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=MAX_CONNECTIONS_PER_HOST,
+    pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+))
+
+# Deletes the characters that are not allowed in filenames
+UNSAFE_FILENAME_CHARS = str.maketrans('', '', '<>:"/\\|?*')
+
+def clean_title(title):
+    """Make a report title safe to use in a filename"""
+    return title.translate(UNSAFE_FILENAME_CHARS).strip().replace(' ', '-')
+
+# One PDF link of the index page
+Report = namedtuple('Report', 'date title link type')
+
+# Cells of a listing row, matched by class token; compiled once
+DATE_CELL_XPATH = etree.XPath(".//td[contains(concat(' ', normalize-space(@class), ' '), ' bmdateview ')]")
+TITLE_CELL_XPATH = etree.XPath(".//td[contains(concat(' ', normalize-space(@class), ' '), ' bmtextview ')]")
+LINKS_XPATH = etree.XPath(".//a[@href]")
+
 def get_report_types():
     """Define mappings for regional report types"""
     return {
@@ -19,30 +66,122 @@ def get_report_types():
         'infografía': 'infografia'
     }
 
+def warm_dns(host, port=443):
+    """Resolve host once up front, so the workers' first connections hit a
+    warm resolver cache instead of all looking it up at the same time"""
+    try:
+        socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError as e:
+        logging.warning(f"DNS pre-resolution for {host} failed: {e}")
+
+def start_logging():
+    """Send log records through a queue to one background writer thread, so
+    download workers never wait on the console. Returns what stop_logging needs"""
+    log_queue = queue.Queue(-1)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    listener = QueueListener(log_queue, handler)
+    queue_handler = QueueHandler(log_queue)
+    
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(queue_handler)
+    listener.start()
+    return listener, queue_handler
+
+def stop_logging(listener, queue_handler):
+    """Flush the queued records and detach the handler added by start_logging"""
+    logging.getLogger().removeHandler(queue_handler)
+    listener.stop()
+
+# filename -> {etag, last_modified, size} of every downloaded PDF, kept in the
+# download folder so re-runs can tell whether a remote file changed
+INDEX_FILENAME = ".index.json"
+INDEX_LOCK = threading.Lock()
+
+def load_index(download_folder):
+    try:
+        with open(os.path.join(download_folder, INDEX_FILENAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_index(download_folder, index):
+    try:
+        with open(os.path.join(download_folder, INDEX_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+    except OSError as e:
+        logging.warning(f"Could not save {INDEX_FILENAME}: {e}")
+
+def remote_unchanged(headers, meta):
+    """Compare HEAD response headers with the metadata saved for a file"""
+    if meta.get('etag') and headers.get('ETag'):
+        return headers['ETag'] == meta['etag']
+    # A compressed Content-Length can't be compared with the size on disk
+    return (meta.get('last_modified') is not None
+            and headers.get('Last-Modified') == meta['last_modified']
+            and 'Content-Encoding' not in headers
+            and headers.get('Content-Length') == str(meta.get('size')))
+
 def download_pdf(args):
-    """Single PDF download function"""
-    pdf_url, filepath, retry_count = args
-    for attempt in range(retry_count):
+    """Single PDF download function, the outcome is logged"""
+    pdf_url, filepath, index = args
+    name = os.path.basename(filepath)
+    # Write to a temporary name and rename once complete, so an interrupted
+    # download never shows up as an existing file
+    tmp_path = filepath + ".part"
+    try:
+        headers = {}
+        if os.path.exists(filepath):
+            with INDEX_LOCK:
+                meta = index.get(name)
+            if meta is None:
+                logging.info(f"File already exists: {name}")
+                return
+            
+            # A HEAD is enough when the server still describes the same file,
+            # otherwise a conditional GET only sends the body if it changed.
+            # Asking for identity makes Content-Length the size on disk
+            head = SESSION.head(pdf_url, allow_redirects=True, timeout=TIMEOUT,
+                                headers={'Accept-Encoding': 'identity'})
+            if head.ok and remote_unchanged(head.headers, meta):
+                logging.info(f"Unchanged: {name}")
+                return
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        with SESSION.get(pdf_url, stream=True, timeout=TIMEOUT, headers=headers) as response:
+            if response.status_code == 304:
+                logging.info(f"Unchanged: {name}")
+                return
+            response.raise_for_status()
+            # Copy in 1 MiB blocks
+            response.raw.decode_content = True
+            with open(tmp_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=1 << 20)
+            os.replace(tmp_path, filepath)
+            
+            with INDEX_LOCK:
+                index[name] = {'etag': response.headers.get('ETag'),
+                               'last_modified': response.headers.get('Last-Modified'),
+                               'size': os.path.getsize(filepath)}
+        logging.info(f"Successfully downloaded: {name}")
+    except Exception as e:
         try:
-            if not os.path.exists(filepath):
-                response = requests.get(pdf_url, stream=True)
-                if response.status_code == 200:
-                    with open(filepath, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    return f"Successfully downloaded: {os.path.basename(filepath)}"
-                else:
-                    sleep(1)  # Wait before retry
-            else:
-                return f"File already exists: {os.path.basename(filepath)}"
-        except Exception as e:
-            if attempt == retry_count - 1:
-                return f"Failed after {retry_count} attempts: {str(e)}"
-            sleep(1)
-    return "Max retries reached"
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        logging.error(f"Failed to download {name}: {str(e)}")
+
+def download_shard(tasks):
+    """Download a list of tasks one after another on the same worker thread"""
+    for task in tasks:
+        download_pdf(task)
 
 def scrape_regional_reports(url="https://www.banxico.org.mx/publicaciones-y-prensa/reportes-sobre-las-economias-regionales/reportes-economias-regionales.html", 
-                          use_threading=True, max_workers=4):
+                          use_threading=True, max_workers=MAX_WORKERS):
     """
     Main function to scrape and download regional reports
     Parameters:
@@ -50,42 +189,43 @@ def scrape_regional_reports(url="https://www.banxico.org.mx/publicaciones-y-pren
         use_threading: Enable/disable parallel downloads
         max_workers: Number of concurrent downloads
     """
+    listener, queue_handler = start_logging()
     try:
-        print(f"Starting download from: {url}")
+        logging.info(f"Starting download from: {url}")
+        warm_dns(urlparse(url).hostname)
         download_folder = os.path.join(DEFAULT_BASE_PATH, "banxico_regional_reports")
         Path(download_folder).mkdir(parents=True, exist_ok=True)
         
         base_url = "https://www.banxico.org.mx"
         report_types = get_report_types()
-    
-        def clean_filename(date, title, report_type):
-            clean_title = re.sub(r'[<>:"/\\|?*]', '', title)
-            clean_title = clean_title.strip().replace(' ', '-')
-            return f"{date}_{report_type}_regional_{clean_title}.pdf"
-
-        def create_dataframe_from_html(url):
-            response = requests.get(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            data = {'Date': [], 'Title': [], 'Link': [], 'Type': []}
+
+        def create_reports_from_html(url):
+            response = SESSION.get(url, timeout=TIMEOUT)
+            # Decode with the charset sent in Content-Type, lxml only falls back
+            # to the page's <meta charset> when the header has none
+            has_charset = 'charset' in response.headers.get('Content-Type', '').lower()
+            encoding = response.encoding if has_charset else None
             
-            rows = soup.find_all('tr')
+            reports = []
             
-            for row in rows:
-                date_cell = row.find('td', class_='bmdateview')
-                title_cell = row.find('td', class_='bmtextview')
+            # Stream the rows instead of building the whole page tree, each row
+            # is dropped as soon as its links have been read
+            for _, row in etree.iterparse(BytesIO(response.content), html=True, tag='tr',
+                                          encoding=encoding):
+                date_cells = DATE_CELL_XPATH(row)
+                title_cells = TITLE_CELL_XPATH(row)
                 
-                if date_cell and title_cell:
+                if date_cells and title_cells:
+                    title_cell = title_cells[0]
                     try:
-                        date_str = date_cell.text.strip()
+                        date_str = ''.join(date_cells[0].itertext()).strip()
                         date = datetime.strptime(date_str, '%d/%m/%y')
                         date_formatted = date.strftime('%Y%m')
-                    except:
+                    except ValueError:
                         date_formatted = 'unknown_date'
                     
-                    links = title_cell.find_all('a', href=True)
-                    for link in links:
-                        link_text = link.text.strip().lower()
+                    for link in LINKS_XPATH(title_cell):
+                        link_text = ''.join(link.itertext()).strip().lower()
                         
                         report_type = None
                         for key, value in report_types.items():
@@ -93,49 +233,57 @@ def scrape_regional_reports(url="https://www.banxico.org.mx/publicaciones-y-pren
                                 report_type = value
                                 break
                         
-                        if report_type and link['href'].endswith('.pdf'):
-                            data['Date'].append(date_formatted)
-                            data['Title'].append(title_cell.contents[0].strip())
-                            data['Link'].append(link['href'])
-                            data['Type'].append(report_type)
+                        href = link.get('href')
+                        if report_type and href.endswith('.pdf'):
+                            reports.append(Report(date_formatted, (title_cell.text or '').strip(),
+                                                  href, report_type))
+                
+                row.clear()
+                while row.getprevious() is not None:
+                    del row.getparent()[0]
             
-            return pd.DataFrame(data)
+            return reports
 
-        df = create_dataframe_from_html(url)
+        reports = create_reports_from_html(url)
         
         # Download PDFs
+        index = load_index(download_folder)
         download_tasks = []
         
-        for _, row in df.iterrows():
-            pdf_url = f"{base_url}{row['Link']}" if row['Link'].startswith('/') else row['Link']
-            clean_title = re.sub(r'[<>:"/\\|?*]', '', row['Title'])
-            clean_title = clean_title.strip().replace(' ', '-')
-            filename = f"{row['Date']}_{row['Type']}_{clean_title}.pdf"
+        for report in reports:
+            pdf_url = f"{base_url}{report.link}" if report.link.startswith('/') else report.link
+            filename = f"{report.date}_{report.type}_{clean_title(report.title)}.pdf"
             filepath = os.path.join(download_folder, filename)
-            download_tasks.append((pdf_url, filepath, 3))  # 3 retries per file
+            download_tasks.append((pdf_url, filepath, index))
         
         if use_threading:
-            print(f"Starting parallel download with {max_workers} workers")
+            # Every download hits the same host: one thread per open connection
+            max_workers = max(1, min(max_workers, MAX_CONNECTIONS_PER_HOST, len(download_tasks)))
+            logging.info(f"Starting parallel download with {max_workers} workers")
+            # One shard per worker: each thread works through its share over its
+            # own keep-alive connection instead of picking tasks one by one
+            shards = [download_tasks[i::max_workers] for i in range(max_workers)]
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [executor.submit(download_pdf, task) for task in download_tasks]
+                futures = [executor.submit(download_shard, shard) for shard in shards]
                 for future in as_completed(futures):
-                    print(future.result())
+                    future.result()
         else:
-            print("Starting sequential download")
+            logging.info("Starting sequential download")
             for task in download_tasks:
-                result = download_pdf(task)
-                print(result)
-                sleep(0.5)  # Delay between downloads
+                download_pdf(task)
         
-        return df
+        save_index(download_folder, index)
+        return reports
         
     except Exception as e:
-        print(f"Main function error: {str(e)}")
+        logging.error(f"Main function error: {str(e)}")
         return None
+    finally:
+        stop_logging(listener, queue_handler)
 
 if __name__ == "__main__":
     # Example usage with threading
-    df = scrape_regional_reports(use_threading=True, max_workers=10)
+    reports = scrape_regional_reports(use_threading=True, max_workers=MAX_WORKERS)
     
     # Example usage without threading
-    # df = scrape_regional_reports(use_threading=False)
\ No newline at end of file
+    # reports = scrape_regional_reports(use_threading=False)
\ No newline at end of file
@@ -3,11 +3,37 @@
 Simulate GitHub Actions execution locally for testing
 """
 
+import io
 import os
-import sys
+import runpy
 import subprocess
+import sys
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
 from datetime import datetime
 
+def run_script(path):
+    """Run a script's __main__ block in this process, capturing its output.
+
+    Returns (error, stdout, stderr). There is no timeout: a thread can't be
+    stopped, so steps that need one are run in a subprocess instead.
+    """
+    error = None
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            runpy.run_path(path, run_name="__main__")
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                error = e
+        except Exception as e:
+            error = e
+    return error, stdout.getvalue(), stderr.getvalue()
+
+def format_error(error, stderr):
+    """Captured stderr plus the traceback of the exception a script raised"""
+    return stderr + ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+
 def simulate_github_actions():
     """Simulate the GitHub Actions workflow steps"""
     print("🚀 Simulating GitHub Actions Workflow")
@@ -24,22 +50,22 @@ def simulate_github_actions():
     # Step 2: Run debug script
     print("\n📋 Running debug workflow...")
     try:
-        result = subprocess.run([sys.executable, 'debug_workflow.py'], 
-                               capture_output=True, text=True)
-        if result.returncode == 0:
+        error, stdout, stderr = run_script('debug_workflow.py')
+        if error is None:
             print("✅ Debug script completed successfully")
             print("Debug output:")
-            print(result.stdout)
+            print(stdout)
         else:
             print("❌ Debug script failed")
-            print(result.stderr)
+            print(format_error(error, stderr))
     except Exception as e:
         print(f"❌ Error running debug script: {e}")
     
     # Step 3: Test one of the scripts (library updates as example)
     print("\n📚 Testing library updates script...")
     try:
-        # Run with a timeout to avoid hanging
+        # Run with a timeout to avoid hanging, in a subprocess so that a timed
+        # out download is actually stopped
         result = subprocess.run([sys.executable, 'scripts/library_updates-monthly.py'], 
                                capture_output=True, text=True, timeout=60)
         if result.returncode == 0:
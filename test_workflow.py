@@ -4,17 +4,22 @@ Test script to validate that all dependencies and scripts work correctly
 """
 
 import sys
+import importlib
 import importlib.util
+import py_compile
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Distribution names whose import name differs
+IMPORT_NAMES = {'beautifulsoup4': 'bs4'}
+
 def test_dependencies():
     """Test that all required dependencies are installed"""
     dependencies = [
         'requests',
         'beautifulsoup4', 
-        'pandas',
-        'pathlib',
+        'lxml',
         'tqdm'
     ]
     
@@ -22,18 +27,29 @@ def test_dependencies():
     failed = []
     
     for dep in dependencies:
-        try:
-            if dep == 'beautifulsoup4':
-                import bs4
-            else:
-                __import__(dep)
+        # Only look the package up, importing it would run its initialization
+        if importlib.util.find_spec(IMPORT_NAMES.get(dep, dep)) is not None:
             print(f"✅ {dep} - OK")
-        except ImportError:
+        else:
             print(f"❌ {dep} - MISSING")
             failed.append(dep)
     
     return len(failed) == 0, failed
 
+def compile_script(path):
+    """Compile one script, return None if it is fine or (kind, error)"""
+    try:
+        # Try to compile the code
+        py_compile.compile(path, doraise=True)
+        return None
+        
+    except py_compile.PyCompileError as e:
+        if isinstance(e.exc_value, SyntaxError):
+            return ("Syntax Error", str(e.exc_value))
+        return ("Other Error", e.msg)
+    except Exception as e:
+        return ("Other Error", str(e))
+
 def test_script_syntax():
     """Test that all Python scripts have valid syntax"""
     scripts_dir = Path("scripts")
@@ -42,21 +58,71 @@ def test_script_syntax():
     print(f"\nTesting syntax for {len(scripts)} scripts...")
     failed = []
     
-    for script in scripts:
-        try:
-            with open(script, 'r', encoding='utf-8') as f:
-                code = f.read()
-            
-            # Try to compile the code
-            compile(code, str(script), 'exec')
+    # Compiling is CPU-bound and independent per script, so use processes
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(compile_script, map(str, scripts)))
+    
+    for script, error in zip(scripts, results):
+        if error is None:
             print(f"✅ {script.name} - Syntax OK")
-            
-        except SyntaxError as e:
-            print(f"❌ {script.name} - Syntax Error: {e}")
-            failed.append(script.name)
-        except Exception as e:
-            print(f"⚠️  {script.name} - Other Error: {e}")
-            failed.append(script.name)
+            continue
+        
+        kind, message = error
+        icon = "❌" if kind == "Syntax Error" else "⚠️ "
+        print(f"{icon} {script.name} - {kind}: {message}")
+        failed.append(script.name)
+    
+    return len(failed) == 0, failed
+
+# Filenames and whether the rename scripts should treat them as already renamed
+RENAME_CASES = {
+    "2024-01_Boletin_Biblioteca_Banxico_Enero_2024.pdf": True,
+    "202401_Boletin.pdf": True,
+    "202401_{3F2504E0-4F89-11D3-9A0C-0305E82C3301}.pdf": False,
+    "3F2504E0-4F89-11D3-9A0C-0305E82C3301.pdf": False,
+}
+
+def check_rename_module(name):
+    """Classify RENAME_CASES with the module's RE2 set, if any, and with plain re"""
+    module = importlib.import_module(name)
+    paths = {"re": None}
+    if module.FILENAME_SET is not None:
+        paths["re2"] = module.FILENAME_SET
+    
+    errors = []
+    try:
+        for path, filename_set in paths.items():
+            module.FILENAME_SET = filename_set
+            module.is_already_renamed.cache_clear()
+            for filename, expected in RENAME_CASES.items():
+                try:
+                    result = module.is_already_renamed(filename)
+                except Exception as e:
+                    result = e
+                if result != expected:
+                    errors.append(f"{path}: {filename} -> {result!r}, expected {expected}")
+    finally:
+        module.FILENAME_SET = paths.get("re2")
+        module.is_already_renamed.cache_clear()
+    return errors
+
+def test_rename_patterns():
+    """Test that the rename scripts classify filenames the same with and without RE2"""
+    print(f"\nTesting rename filename patterns...")
+    
+    # The rename scripts import pypdf at the top
+    if importlib.util.find_spec('pypdf') is None:
+        print("⚠️  pypdf not installed - skipped")
+        return True, []
+    
+    failed = []
+    for name in ("auto_rename_library_pdfs", "rename_library_pdfs"):
+        errors = check_rename_module(name)
+        if errors:
+            print(f"❌ {name} - " + "; ".join(errors))
+            failed.append(name)
+        else:
+            print(f"✅ {name} - OK")
     
     return len(failed) == 0, failed
 
@@ -100,6 +166,12 @@ def main():
         print(f"\n❌ Scripts with syntax errors: {', '.join(syntax_failed)}")
         all_passed = False
     
+    # Test rename filename patterns
+    rename_ok, rename_failed = test_rename_patterns()
+    if not rename_ok:
+        print(f"\n❌ Filename patterns misclassified: {', '.join(rename_failed)}")
+        all_passed = False
+    
     # Test directories
     dirs_ok, dirs_failed = test_directories()
     if not dirs_ok: